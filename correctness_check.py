@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import hashlib
 import json
 import os
 import subprocess
@@ -8,58 +9,206 @@ import sys
 from finding_types import CodeReviewFinding, CommandFinding, Finding
 
 NON_UTF8 = "<non-UTF8 output>"
-COMMAND = "uv run --group dev pyright ."
+EMPTY_FINDINGS_JSON = b'{"per_file_findings":[],"overall_findings":[]}\n'
+COMMAND_ARGV = ["uv", "run", "--group", "dev", "pyright", "."]
+# Set to a thread count to have pyright type-check files in parallel.
+# Unset (the default) keeps pyright single-threaded.
+PYRIGHT_JOBS_ENV_VAR = "BORK_PYRIGHT_JOBS"
+
+VENV_DIR = os.environ.get("UV_PROJECT_ENVIRONMENT", ".venv")
+
+# Stamps live inside the venv, so deleting the venv also invalidates them.
+# `uv sync` is skipped when its inputs are byte-identical to the last successful sync.
+SYNC_INPUTS = [b"pyproject.toml", b"uv.lock"]
+SYNC_STAMP = os.path.join(VENV_DIR, ".bork-uv-sync.stamp")
+# Pyright is skipped when every Python file and config it reads is byte-identical
+# to the last run that came back clean.
+PYRIGHT_CONFIG_INPUTS = [b"pyrightconfig.json", b"pyproject.toml", b"uv.lock"]
+PYRIGHT_STAMP = os.path.join(VENV_DIR, ".bork-pyright-clean.stamp")
+# Pyright's default excludes, alongside any directory whose name starts with a dot.
+PYRIGHT_EXCLUDED_DIRS = {b"node_modules", b"__pycache__"}
 
 
 def _decode_or_placeholder(raw: bytes) -> str:
+    # Pyright's output is almost always pure ASCII, which needs no UTF-8 validation.
+    if raw.isascii():
+        return raw.decode("ascii")
     try:
         return raw.decode("utf-8")
     except (UnicodeDecodeError, AttributeError):
         return NON_UTF8
 
-def main() -> None:
+
+def _command_argv() -> list[str]:
+    jobs = os.environ.get(PYRIGHT_JOBS_ENV_VAR)
+    if not jobs:
+        return COMMAND_ARGV
+    if not jobs.isdigit() or int(jobs) < 1:
+        raise ValueError(f"{PYRIGHT_JOBS_ENV_VAR} must be a positive integer, got {jobs!r}")
+    return [*COMMAND_ARGV, "--threads", jobs]
+
+
+def _write_json(payload: object) -> None:
+    # Compact separators: the harness feeds this output back into the LLM prompt.
+    sys.stdout.buffer.write(json.dumps(payload, separators=(",", ":")).encode("ascii"))
+    sys.stdout.buffer.write(b"\n")
+
+
+def _digest_files(paths: list[bytes], missing_ok: bool) -> str | None:
+    # None means the inputs can't be fingerprinted, so the work must just be done.
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                contents: bytes | None = f.read()
+        except FileNotFoundError:
+            if not missing_ok:
+                return None
+            contents = None
+        except OSError:
+            return None
+        for field in (path, contents):
+            if field is None:
+                digest.update(b"\x00")
+                continue
+            digest.update(b"\x01")
+            digest.update(len(field).to_bytes(8, "big"))
+            digest.update(field)
+    return digest.hexdigest()
+
+
+def _read_stamp(path: str) -> str | None:
     try:
-        subprocess.run(["uv", "sync"], capture_output=True, check=True)
-    except Exception as e:
-        print(json.dumps({"per_file_findings": [], "overall_findings": []}))
-        print(f"correctness checker failed to sync venv: {e}", file=sys.stderr)
-        sys.exit(2)
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_stamp(path: str, fingerprint: str) -> None:
+    # Stamps are only an optimisation; failing to record one just means the work is redone next time.
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(fingerprint)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
 
-    per_file_findings: list[CodeReviewFinding] = []
-    overall_findings: list[Finding] = []
+
+def _uv_sync_if_stale() -> None:
+    fingerprint = _digest_files(SYNC_INPUTS, missing_ok=False)
+    if fingerprint is not None and _read_stamp(SYNC_STAMP) == fingerprint:
+        return
+    subprocess.run(["uv", "sync"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    if fingerprint is not None:
+        _write_stamp(SYNC_STAMP, fingerprint)
+
+
+def _pyright_analyses(path: bytes) -> bool:
+    return not any(part.startswith(b".") or part in PYRIGHT_EXCLUDED_DIRS for part in path.split(b"/")[:-1])
+
+
+def _pyright_fingerprint() -> str | None:
+    # Pyright doesn't read .gitignore, so ignored files count too; only its default
+    # excludes are left out. The -x patterns keep git from walking those directories
+    # for untracked files, and the filter below drops tracked files inside them.
+    try:
+        listing = subprocess.run(
+            [
+                "git", "ls-files", "-z", "--cached", "--others",
+                "-x", ".*", "-x", "node_modules", "-x", "__pycache__",
+                "--", "*.py", "*.pyi",
+            ],
+            capture_output=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if listing.returncode != 0:
+        return None
+    sources = sorted({path for path in listing.stdout.split(b"\0") if path and _pyright_analyses(path)})
+    return _digest_files(PYRIGHT_CONFIG_INPUTS + sources, missing_ok=True)
+
+
+def _run_pyright() -> CommandFinding | None:
+    # Imported here so runs that skip pyright (see PYRIGHT_STAMP) don't pay for it.
+    import tempfile
 
     # Pyright reads typeCheckingMode from pyrightconfig.json.
     # Create a temporary one with strict mode if none exists.
+    # The config must live in the repo root: pyright resolves its default excludes
+    # (e.g. `**/.*`, which covers .venv) relative to the config file's directory.
+    # Exclusive creation means we never clobber, or later delete, a config that
+    # someone else created concurrently.
     config_path = "pyrightconfig.json"
-    created_config = not os.path.exists(config_path)
-    if created_config:
-        with open(config_path, "w") as f:
+    try:
+        with open(config_path, "x") as f:
             json.dump({"typeCheckingMode": "strict"}, f)
+        created_config = True
+    except FileExistsError:
+        created_config = False
 
-    try:
-        result = subprocess.run(
-            COMMAND.split(),
-            capture_output=True,
+    # Pyright's diagnostics go straight to anonymous temporary files rather than
+    # pipes, so nothing is held in memory unless we actually need to report it.
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        try:
+            argv = _command_argv()
+            result = subprocess.run(
+                argv,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                check=False,
+            )
+        except Exception as e:
+            sys.stdout.buffer.write(EMPTY_FINDINGS_JSON)
+            print(f"correctness checker failed to invoke command: {e}", file=sys.stderr)
+            sys.exit(2)
+        finally:
+            if created_config:
+                try:
+                    os.remove(config_path)
+                except OSError:
+                    pass
+
+        if result.returncode == 0:
+            return None
+
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        return CommandFinding(
+            provenance="command",
+            command=" ".join(argv),
+            stdout=_decode_or_placeholder(stdout_file.read()),
+            stderr=_decode_or_placeholder(stderr_file.read()),
+            **{"exit-code": result.returncode},
         )
+
+
+def main() -> None:
+    try:
+        _uv_sync_if_stale()
+    except subprocess.CalledProcessError as e:
+        sys.stdout.buffer.write(EMPTY_FINDINGS_JSON)
+        stderr = e.stderr.decode("utf-8", "replace") if isinstance(e.stderr, bytes) else ""
+        print(f"correctness checker failed to sync venv: {e}\n{stderr}", file=sys.stderr)
+        sys.exit(2)
     except Exception as e:
-        print(json.dumps({"per_file_findings": [], "overall_findings": []}))
-        print(f"correctness checker failed to invoke command: {e}", file=sys.stderr)
+        sys.stdout.buffer.write(EMPTY_FINDINGS_JSON)
+        print(f"correctness checker failed to sync venv: {e}", file=sys.stderr)
         sys.exit(2)
-    finally:
-        if created_config:
-            try:
-                os.remove(config_path)
-            except OSError:
-                pass
-
-    if result.returncode != 0:
-        overall_findings.append(CommandFinding(
-            provenance="command",
-            command=COMMAND,
-            stdout=_decode_or_placeholder(result.stdout),
-            stderr=_decode_or_placeholder(result.stderr),
-            **{"exit-code": result.returncode},
-        ))
+
+    per_file_findings: list[CodeReviewFinding] = []
+    overall_findings: list[Finding] = []
+
+    fingerprint = _pyright_fingerprint()
+    if fingerprint is None or _read_stamp(PYRIGHT_STAMP) != fingerprint:
+        pyright_finding = _run_pyright()
+        if pyright_finding is not None:
+            overall_findings.append(pyright_finding)
+        elif fingerprint is not None and _pyright_fingerprint() == fingerprint:
+            # An edit made while pyright was running may not have been checked.
+            _write_stamp(PYRIGHT_STAMP, fingerprint)
 
     # LLM code review of changed files.
     try:
@@ -75,7 +224,7 @@ def main() -> None:
         print(f"correctness checker: LLM review failed: {e}", file=sys.stderr)
 
     output = {"per_file_findings": per_file_findings, "overall_findings": overall_findings}
-    print(json.dumps(output))
+    _write_json(output)
     sys.exit(1 if per_file_findings or overall_findings else 0)
 
 
@@ -2,14 +2,24 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import errno
 import importlib
+import io
 import json
 import os
+import stat
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path, PurePosixPath
-from typing import Final, Mapping, Sequence, cast
+from typing import TYPE_CHECKING, Final, Iterator, Mapping, Sequence, TextIO, cast
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.responses import ResponseInputParam, ToolParam
 
 MAX_ITERATIONS: Final[int] = 5
 MODEL_NAME: Final[str] = 'gpt-5.3-codex'
@@ -18,13 +28,59 @@ NON_UTF8_PLACEHOLDER: Final[str] = '<non-UTF8 output>'
 DEBUG_ENV_VAR: Final[str] = 'BORK_ENABLE_DEBUG_LOG'
 NL: Final[str] = chr(10)
 DOUBLE_NL: Final[str] = NL + NL
+READ_CHUNK_BYTES: Final[int] = 1 << 16
+UTF8_SNIFF_BYTES: Final[int] = 1 << 13
+DIR_OPEN_FLAGS: Final[int] = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC
+FILE_WRITE_FLAGS: Final[int] = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW | os.O_CLOEXEC
+DIR_FD_CACHE_LIMIT: Final[int] = 64
+PARALLEL_READ_MIN_FILES: Final[int] = 32
+PARALLEL_READ_WORKERS: Final[int] = 8
+PROMPT_PREAMBLE: Final[str] = DOUBLE_NL.join(
+    [
+        'You are a coding agent reconciling code and specs.',
+        'Do not assume any code is currently correct.',
+        'Changes to specs are a last resort unless specs contradict each other.',
+        'If specs are contradictory or incomplete, use the provided tools.',
+        'Respond with ONLY a JSON object with keys high-level-description, implementation-decisions, create-or-update, and delete.',
+    ]
+) + DOUBLE_NL
+LLM_TOOLS: Final[list[dict[str, object]]] = [
+    {
+        'type': 'function',
+        'name': 'resolve-spec-contradiction',
+        'description': 'Use when specs appear contradictory.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'spec-files': {'type': 'array', 'items': {'type': 'string'}},
+                'snippets': {'type': 'array', 'items': {'type': 'string'}},
+                'contradiction': {'type': 'string'},
+            },
+            'required': ['spec-files', 'snippets', 'contradiction'],
+        },
+    },
+    {
+        'type': 'function',
+        'name': 'incomplete-spec',
+        'description': 'Use when specs are insufficient to make a decision.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'spec-files': {'type': 'array', 'items': {'type': 'string'}},
+                'incompleteness': {'type': 'string'},
+                'degrees-of-freedom': {'type': 'array', 'items': {'type': 'string'}},
+            },
+            'required': ['spec-files', 'incompleteness', 'degrees-of-freedom'],
+        },
+    },
+]
 
 
 @dataclass(frozen=True)
 class BorkConfig:
     correctness_checker: Path | None
-    edits_require_approval: set[PurePosixPath]
-    not_sent: set[PurePosixPath]
+    edits_require_approval: frozenset[PurePosixPath]
+    not_sent: frozenset[PurePosixPath]
 
 
 @dataclass(frozen=True)
@@ -93,10 +149,12 @@ def _getattr_object(obj: object, attr_name: str) -> object:
 
 def _load_config(repo_root: Path) -> BorkConfig:
     config_path = repo_root / '.config' / 'bork.json'
-    if not config_path.exists():
-        return BorkConfig(None, set(), set())
+    try:
+        config_bytes = config_path.read_bytes()
+    except FileNotFoundError:
+        return BorkConfig(None, frozenset(), frozenset())
 
-    raw_obj: object = json.loads(config_path.read_text(encoding='utf-8'))
+    raw_obj: object = json.loads(config_bytes)
     raw_map = _coerce_str_object_dict(raw_obj)
     if raw_map is None:
         raise ValueError('Config must be a JSON object.')
@@ -111,10 +169,10 @@ def _load_config(repo_root: Path) -> BorkConfig:
             raise ValueError('correctness-checker must resolve within the Git repository root.')
         checker_path = candidate
 
-    def parse_list(field_name: str) -> set[PurePosixPath]:
+    def parse_list(field_name: str) -> frozenset[PurePosixPath]:
         value_obj = raw_map.get(field_name)
         if value_obj is None:
-            return set()
+            return frozenset()
         value_list = _coerce_object_list(value_obj)
         if value_list is None:
             raise ValueError(f'{field_name} must be a list.')
@@ -127,7 +185,7 @@ def _load_config(repo_root: Path) -> BorkConfig:
             if normalised is None:
                 raise ValueError(f'Invalid path in {field_name}: {item_obj}')
             result.add(normalised)
-        return result
+        return frozenset(result)
 
     return BorkConfig(checker_path, parse_list('edits-require-approval'), parse_list('not-sent'))
 
@@ -141,42 +199,89 @@ def _run_git(repo_root: Path, args: Sequence[str]) -> subprocess.CompletedProces
     )
 
 
-def _list_source_files(repo_root: Path, source_dir: Path) -> list[PurePosixPath]:
-    source_resolved = source_dir.resolve()
-    repo_resolved = repo_root.resolve()
-    source_rel_to_repo = source_resolved.relative_to(repo_resolved)
+def _run_git_bytes(repo_root: Path, args: Sequence[str]) -> subprocess.CompletedProcess[bytes]:
+    return subprocess.run(
+        ['git', '-C', str(repo_root), *args],
+        check=False,
+        capture_output=True,
+    )
 
-    result = _run_git(
+
+def _git_ls_source_files(
+    repo_root: Path,
+    source_rel_to_repo: Path,
+    pathspec: Path,
+    ls_files_args: Sequence[str],
+) -> list[PurePosixPath] | None:
+    # -z: paths are NUL-terminated and never C-quoted, so git emits their raw bytes.
+    # Each one is decoded separately, so a single non-UTF-8 name is skipped (it couldn't
+    # be sent to the model anyway) rather than failing the whole listing.
+    result = _run_git_bytes(
         repo_root,
-        ['ls-files', '--cached', '--others', '--exclude-standard', '--full-name', '--', str(source_rel_to_repo)],
+        ['ls-files', '-z', *ls_files_args, '--full-name', '--', str(pathspec)],
     )
+    if result.returncode != 0:
+        return None
 
     files: list[PurePosixPath] = []
-    if result.returncode == 0:
-        for line in result.stdout.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-            repo_rel = Path(stripped)
-            try:
-                source_rel = repo_rel.relative_to(source_rel_to_repo)
-            except ValueError:
-                continue
-            normalised = _normalise_relative_path(source_rel.as_posix())
-            if normalised is not None:
-                files.append(normalised)
-        return sorted(files)
-
-    for path in source_dir.rglob('*'):
-        if not path.is_file():
+    for raw_entry in result.stdout.split(b'\0'):
+        if not raw_entry:
+            continue
+        try:
+            entry = raw_entry.decode('utf-8')
+        except UnicodeDecodeError:
+            _debug_log(f'Skipping non-UTF-8 path from git: {raw_entry!r}')
             continue
+        repo_rel = Path(entry)
         try:
-            rel = path.resolve().relative_to(source_resolved).as_posix()
+            source_rel = repo_rel.relative_to(source_rel_to_repo)
         except ValueError:
             continue
-        normalised = _normalise_relative_path(rel)
+        normalised = _normalise_relative_path(source_rel.as_posix())
         if normalised is not None:
             files.append(normalised)
+    return files
+
+
+def _list_source_files(repo_root: Path, source_dir: Path, source_rel_to_repo: Path) -> list[PurePosixPath]:
+    listed = _git_ls_source_files(
+        repo_root,
+        source_rel_to_repo,
+        source_rel_to_repo,
+        ['--cached', '--others', '--exclude-standard'],
+    )
+    if listed is not None:
+        return sorted(listed)
+
+    return _walk_source_files(source_dir)
+
+
+def _walk_source_files(source_dir: Path) -> list[PurePosixPath]:
+    # Fallback when git can't list the files. DirEntry carries the file type from
+    # readdir, so classifying an entry needs no extra stat. Symlinks are listed
+    # as themselves (as git would list them) and never followed. Git never lists its
+    # own metadata, so `.git` is pruned rather than walked and sent to the model.
+    # FIFOs, sockets and devices are dropped, as git can't track them either.
+    files: list[PurePosixPath] = []
+    pending: list[tuple[str, str]] = [(str(source_dir), '')]
+    while pending:
+        dir_path, rel_prefix = pending.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.name == '.git':
+                        continue
+                    rel = rel_prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, rel + '/'))
+                        continue
+                    if not (entry.is_file(follow_symlinks=False) or entry.is_symlink()):
+                        continue
+                    normalised = _normalise_relative_path(rel)
+                    if normalised is not None:
+                        files.append(normalised)
+        except OSError:
+            continue
     return sorted(files)
 
 
@@ -190,68 +295,111 @@ def _checker_source_relative(source_dir: Path, checker_path: Path | None) -> Pur
     return _normalise_relative_path(rel)
 
 
-def _safe_read_bytes(source_dir: Path, rel: PurePosixPath) -> bytes | None:
-    root = source_dir.resolve()
+def _open_regular_file(root: Path, rel: PurePosixPath) -> tuple[int, int] | None:
     path = root / rel.as_posix()
 
-    if path.is_symlink():
+    try:
+        resolved_parent = path.parent.resolve()
+    except OSError:
+        return None
+
+    if not resolved_parent.is_relative_to(root):
         return None
 
+    # O_NOFOLLOW refuses a symlinked leaf atomically with the open itself. O_NONBLOCK
+    # stops the open from waiting on a FIFO's writer before fstat can reject it; it
+    # has no effect on reads from a regular file.
     try:
-        resolved = path.resolve()
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC | os.O_NONBLOCK)
     except OSError:
         return None
 
-    if not resolved.is_relative_to(root):
+    try:
+        st = os.fstat(fd)
+    except OSError:
+        os.close(fd)
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        os.close(fd)
         return None
+    return fd, st.st_size
+
+
+def _read_to_end(fd: int, size_hint: int) -> list[bytes]:
+    chunks: list[bytes] = []
+    while chunk := os.read(fd, max(size_hint, READ_CHUNK_BYTES)):
+        chunks.append(chunk)
+    return chunks
+
+
+def _safe_read_text(root: Path, rel: PurePosixPath) -> str | None:
+    opened = _open_regular_file(root, rel)
+    if opened is None:
+        return None
+    fd, size = opened
 
     try:
-        return path.read_bytes()
+        head = os.read(fd, UTF8_SNIFF_BYTES)
+        # Binary files almost always fail UTF-8 validation within their first few bytes,
+        # so give up on them before paying to read the rest. The incremental decoder
+        # tolerates a multi-byte sequence split at the end of the head.
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        except UnicodeDecodeError:
+            return NON_UTF8_PLACEHOLDER
+        return _decode_utf8_or_placeholder(b''.join([head, *_read_to_end(fd, size - len(head))]))
     except OSError:
         return None
+    finally:
+        os.close(fd)
+
+
+def _file_body(root: Path, rel: PurePosixPath, send: bool) -> str:
+    if not send:
+        return '<contents omitted by not-sent policy>'
+    text = _safe_read_text(root, rel)
+    if text is None:
+        return '<contents omitted by path safety policy>'
+    return text
+
+
+def _read_files(root: Path, entries: Sequence[tuple[PurePosixPath, bool]]) -> Iterator[str]:
+    # Yields one body per entry, in order; reads overlap in a small pool unless the tree is tiny.
+    if len(entries) < PARALLEL_READ_MIN_FILES:
+        for rel, send in entries:
+            yield _file_body(root, rel, send)
+        return
+    with ThreadPoolExecutor(max_workers=PARALLEL_READ_WORKERS) as pool:
+        yield from pool.map(
+            partial(_file_body, root),
+            [rel for rel, _ in entries],
+            [send for _, send in entries],
+        )
 
 
 def _render_codebase(
+    out: TextIO,
     source_dir: Path,
     files: Sequence[PurePosixPath],
     checker_rel: PurePosixPath | None,
-    not_sent: set[PurePosixPath],
-) -> str:
-    chunks: list[str] = []
-    for rel in files:
-        rel_str = rel.as_posix()
-        if checker_rel is not None and rel == checker_rel:
-            continue
-
-        if rel in not_sent:
-            chunks.append(
-                f'''--- FILE: {rel_str} ---
-<contents omitted by not-sent policy>
---- END FILE: {rel_str} ---'''
-            )
-            continue
-
-        file_bytes = _safe_read_bytes(source_dir, rel)
-        if file_bytes is None:
-            chunks.append(
-                f'''--- FILE: {rel_str} ---
-<contents omitted by path safety policy>
---- END FILE: {rel_str} ---'''
-            )
-            continue
-
-        text = _decode_utf8_or_placeholder(file_bytes)
-        chunks.append(
-            f'''--- FILE: {rel_str} ---
-{text}
---- END FILE: {rel_str} ---'''
-        )
+    not_sent: frozenset[PurePosixPath],
+) -> None:
+    root = source_dir.resolve()
+    # Decided once per file: the checker is left out entirely, and a not-sent file is
+    # listed but never read.
+    entries = [(rel, rel not in not_sent) for rel in files if rel != checker_rel]
 
-    return DOUBLE_NL.join(chunks)
+    separator = ''
+    for (rel, _), body in zip(entries, _read_files(root, entries), strict=True):
+        rel_str = rel.as_posix()
+        out.write(separator)
+        separator = DOUBLE_NL
+        out.write(f'--- FILE: {rel_str} ---{NL}')
+        out.write(body)
+        out.write(f'{NL}--- END FILE: {rel_str} ---')
 
 
-def _specs_diff_against_main(repo_root: Path, source_dir: Path) -> str:
-    source_rel_to_repo = source_dir.resolve().relative_to(repo_root.resolve())
+def _specs_diff_against_main(repo_root: Path, source_rel_to_repo: Path) -> str:
     specs_rel = source_rel_to_repo / 'specs'
 
     diff_result = _run_git(repo_root, ['diff', 'main', '--', str(specs_rel)])
@@ -262,25 +410,9 @@ def _specs_diff_against_main(repo_root: Path, source_dir: Path) -> str:
     if diff_result.stdout.strip():
         sections.append(diff_result.stdout.rstrip(NL))
 
-    new_specs_result = _run_git(
-        repo_root,
-        ['ls-files', '--others', '--exclude-standard', '--full-name', '--', str(specs_rel)],
-    )
-    if new_specs_result.returncode == 0:
-        newly_added: list[str] = []
-        for line in new_specs_result.stdout.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-            repo_rel = Path(stripped)
-            try:
-                source_rel = repo_rel.relative_to(source_rel_to_repo)
-            except ValueError:
-                continue
-            normalised = _normalise_relative_path(source_rel.as_posix())
-            if normalised is not None:
-                newly_added.append(normalised.as_posix())
-
+    new_specs = _git_ls_source_files(repo_root, source_rel_to_repo, specs_rel, ['--others', '--exclude-standard'])
+    if new_specs is not None:
+        newly_added = [path.as_posix() for path in new_specs]
         if newly_added:
             rendered = NL.join(f'{path} (newly added)' for path in sorted(set(newly_added)))
             sections.append(
@@ -319,59 +451,31 @@ def _extract_tool_calls(response: object) -> list[ToolCall]:
     return calls
 
 
-def _invoke_llm(prompt: str) -> str:
-    fake_output = os.getenv('BORK_FAKE_LLM_OUTPUT')
-    if fake_output is not None:
-        return fake_output
-
+def _openai_client() -> OpenAI:
     openai_module = importlib.import_module('openai')
-    openai_client_ctor = getattr(openai_module, 'OpenAI', None)
+    openai_client_ctor = cast('type[OpenAI] | None', getattr(openai_module, 'OpenAI', None))
     if openai_client_ctor is None:
         raise RuntimeError('openai.OpenAI is unavailable.')
 
-    client = openai_client_ctor(timeout=REQUEST_TIMEOUT_SECONDS)
-
-    tools: list[dict[str, object]] = [
-        {
-            'type': 'function',
-            'name': 'resolve-spec-contradiction',
-            'description': 'Use when specs appear contradictory.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'spec-files': {'type': 'array', 'items': {'type': 'string'}},
-                    'snippets': {'type': 'array', 'items': {'type': 'string'}},
-                    'contradiction': {'type': 'string'},
-                },
-                'required': ['spec-files', 'snippets', 'contradiction'],
-            },
-        },
-        {
-            'type': 'function',
-            'name': 'incomplete-spec',
-            'description': 'Use when specs are insufficient to make a decision.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'spec-files': {'type': 'array', 'items': {'type': 'string'}},
-                    'incompleteness': {'type': 'string'},
-                    'degrees-of-freedom': {'type': 'array', 'items': {'type': 'string'}},
-                },
-                'required': ['spec-files', 'incompleteness', 'degrees-of-freedom'],
-            },
-        },
-    ]
+    return openai_client_ctor(timeout=REQUEST_TIMEOUT_SECONDS)
+
 
-    current_input: object = prompt
+def _invoke_llm(prompt: str, llm: OpenAI | str) -> str:
+    if isinstance(llm, str):
+        return llm
+
+    current_input: str | ResponseInputParam = prompt
     previous_response_id: str | None = None
 
     while True:
         _debug_log(f'LLM request input: {current_input!r}')
-        with client.responses.stream(
+        with llm.responses.stream(
             model=MODEL_NAME,
             input=current_input,
             previous_response_id=previous_response_id,
-            tools=tools,
+            # The SDK's TypedDict requires `strict`; the tools leave it out so the API
+            # default applies.
+            tools=cast('list[ToolParam]', LLM_TOOLS),
             reasoning={'effort': 'high'},
         ) as stream:
             for event in stream:
@@ -386,7 +490,7 @@ def _invoke_llm(prompt: str) -> str:
         if not tool_calls:
             return output_text
 
-        outputs: list[dict[str, str]] = []
+        outputs: ResponseInputParam = []
         for call in tool_calls:
             print(
                 f'''Tool call requested: {call.name}
@@ -483,23 +587,117 @@ def _ask_approval(prompt: str) -> bool:
     return input().strip().lower() in {'y', 'yes'}
 
 
-def _validated_target(source_dir: Path, rel: PurePosixPath) -> Path:
-    root = source_dir.resolve()
-    target = root / rel.as_posix()
+def _open_child_dir(parent_fd: int, name: str, display_path: Path, create: bool) -> int:
+    try:
+        return os.open(name, DIR_OPEN_FLAGS, dir_fd=parent_fd)
+    except FileNotFoundError:
+        if not create:
+            raise
+    except NotADirectoryError:
+        # O_NOFOLLOW | O_DIRECTORY reports a symlink as ENOTDIR; single it out so a
+        # planted link is refused loudly rather than looking like a misplaced file.
+        if stat.S_ISLNK(os.stat(name, dir_fd=parent_fd, follow_symlinks=False).st_mode):
+            raise RuntimeError(f'Refusing symlinked parent path: {display_path}') from None
+        raise
 
-    cursor = root
+    try:
+        os.mkdir(name, dir_fd=parent_fd)
+    except FileExistsError:
+        pass
+    return os.open(name, DIR_OPEN_FLAGS, dir_fd=parent_fd)
+
+
+def _open_parent_dir(
+    root: Path,
+    root_fd: int,
+    rel: PurePosixPath,
+    dir_fds: dict[PurePosixPath, int],
+    create: bool,
+) -> int:
+    # Descends from the root one component at a time, never following a symlink, so the
+    # directory that is finally written into is inside the root by construction: plan
+    # paths have no `..` parts, and nothing is looked up by name a second time.
+    # Descriptors are kept in `dir_fds` for the rest of the plan (bounded, and closed by
+    # the caller), so siblings reuse their parent's descent.
+    cached = dir_fds.get(rel.parent)
+    if cached is not None:
+        return cached
+    if len(dir_fds) >= DIR_FD_CACHE_LIMIT:
+        _close_dir_fds(dir_fds)
+
+    fd = root_fd
+    prefix = PurePosixPath()
     for part in rel.parts[:-1]:
-        cursor = cursor / part
-        if cursor.exists() and cursor.is_symlink():
-            raise RuntimeError(f'Refusing symlinked parent path: {cursor}')
+        prefix = prefix / part
+        cached = dir_fds.get(prefix)
+        if cached is None:
+            cached = _open_child_dir(fd, part, root / prefix.as_posix(), create)
+            dir_fds[prefix] = cached
+        fd = cached
+    return fd
+
+
+def _close_dir_fds(dir_fds: dict[PurePosixPath, int]) -> None:
+    for fd in dir_fds.values():
+        os.close(fd)
+    dir_fds.clear()
+
+
+def _file_matches(parent_fd: int, rel: PurePosixPath, data: bytes) -> bool:
+    # Reads through the same descriptor `_write_file` would write into, so the answer is
+    # about the file that would actually be replaced. Anything but a regular file with
+    # exactly these bytes (including a symlinked leaf, which the write then refuses)
+    # counts as changed.
+    try:
+        fd = os.open(rel.name, os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC | os.O_NONBLOCK, dir_fd=parent_fd)
+    except OSError:
+        return False
+
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_size != len(data):
+            return False
+        return b''.join(_read_to_end(fd, st.st_size)) == data
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _write_file(parent_fd: int, rel: PurePosixPath, display_path: Path, data: bytes) -> None:
+    try:
+        fd = os.open(rel.name, FILE_WRITE_FLAGS, 0o666, dir_fd=parent_fd)
+    except OSError as exc:
+        if exc.errno == errno.ELOOP:
+            raise RuntimeError(f'Refusing symlinked target path: {display_path}') from exc
+        raise
+
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _delete_file(parent_fd: int, rel: PurePosixPath, display_path: Path) -> None:
+    st = os.stat(rel.name, dir_fd=parent_fd, follow_symlinks=False)
+    if stat.S_ISLNK(st.st_mode):
+        raise RuntimeError(f'Refusing symlinked target path: {display_path}')
+    if stat.S_ISREG(st.st_mode):
+        os.unlink(rel.name, dir_fd=parent_fd)
 
-    if target.exists() and target.is_symlink():
-        raise RuntimeError(f'Refusing symlinked target path: {target}')
 
-    if not target.parent.resolve().is_relative_to(root):
-        raise RuntimeError(f'Refusing path outside source directory: {target}')
+def _refusal_reason(rel: PurePosixPath, checker_rel: PurePosixPath | None) -> str | None:
+    if checker_rel is not None and rel == checker_rel:
+        return 'immutable checker'
+    if rel.parts[0] == '.git':
+        return 'Git metadata'
+    return None
 
-    return target
+
+def _needs_approval(rel: PurePosixPath, config: BorkConfig) -> bool:
+    return rel.parts[0] == 'specs' or rel in config.edits_require_approval
 
 
 def _apply_plan(
@@ -509,41 +707,62 @@ def _apply_plan(
     config: BorkConfig,
     checker_rel: PurePosixPath | None,
 ) -> None:
-    for rel, contents in create.items():
-        if rel in config.not_sent:
-            continue
+    root = source_dir.resolve()
+    root_fd = os.open(root, DIR_OPEN_FLAGS)
+    dir_fds: dict[PurePosixPath, int] = {}
+    try:
+        for rel, contents in create.items():
+            if rel in config.not_sent:
+                continue
 
-        if checker_rel is not None and rel == checker_rel:
-            print(
-                f'''Refused immutable checker edit for {rel}:
+            refusal = _refusal_reason(rel, checker_rel)
+            if refusal is not None:
+                print(
+                    f'''Refused {refusal} edit for {rel}:
 {contents}''',
-                file=sys.stderr,
-            )
-            continue
+                    file=sys.stderr,
+                )
+                continue
 
-        needs_approval = (rel.parts[0] == 'specs') or (rel in config.edits_require_approval)
-        if needs_approval and not _ask_approval(f'Approve write to {rel.as_posix()}?'):
-            continue
+            encoded = contents.encode('utf-8')
+            # Rewriting identical bytes would only churn mtimes and ask the user to approve a no-op.
+            # The parent is opened exactly as for the write, so a symlinked parent is refused here
+            # whatever the contents; a missing parent means the file is new.
+            try:
+                parent_fd = _open_parent_dir(root, root_fd, rel, dir_fds, create=False)
+                unchanged = _file_matches(parent_fd, rel, encoded)
+            except (FileNotFoundError, NotADirectoryError):
+                unchanged = False
+            if unchanged:
+                _debug_log(f'Skipping unchanged write to {rel.as_posix()}')
+                continue
 
-        target = _validated_target(source_dir, rel)
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_text(contents, encoding='utf-8')
+            if _needs_approval(rel, config) and not _ask_approval(f'Approve write to {rel.as_posix()}?'):
+                continue
 
-    for rel in deletes:
-        if rel in config.not_sent:
-            continue
+            parent_fd = _open_parent_dir(root, root_fd, rel, dir_fds, create=True)
+            _write_file(parent_fd, rel, root / rel.as_posix(), encoded)
 
-        if checker_rel is not None and rel == checker_rel:
-            print(f'Refused immutable checker delete for {rel}', file=sys.stderr)
-            continue
+        for rel in deletes:
+            if rel in config.not_sent:
+                continue
 
-        needs_approval = (rel.parts[0] == 'specs') or (rel in config.edits_require_approval)
-        if needs_approval and not _ask_approval(f'Approve delete of {rel.as_posix()}?'):
-            continue
+            refusal = _refusal_reason(rel, checker_rel)
+            if refusal is not None:
+                print(f'Refused {refusal} delete for {rel}', file=sys.stderr)
+                continue
 
-        target = _validated_target(source_dir, rel)
-        if target.exists() and target.is_file():
-            target.unlink()
+            if _needs_approval(rel, config) and not _ask_approval(f'Approve delete of {rel.as_posix()}?'):
+                continue
+
+            try:
+                parent_fd = _open_parent_dir(root, root_fd, rel, dir_fds, create=False)
+                _delete_file(parent_fd, rel, root / rel.as_posix())
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+    finally:
+        _close_dir_fds(dir_fds)
+        os.close(root_fd)
 
 
 def _run_correctness_checker(repo_root: Path, checker_path: Path) -> tuple[bool, str]:
@@ -575,39 +794,44 @@ def run(source_dir: Path) -> int:
     repo_root = _find_repo_root(source_dir)
     config = _load_config(repo_root)
     checker_rel = _checker_source_relative(source_dir, config.correctness_checker)
+    source_rel_to_repo = source_dir.relative_to(repo_root)
+    fake_output = os.getenv('BORK_FAKE_LLM_OUTPUT')
+    llm = fake_output if fake_output is not None else _openai_client()
 
     previous_checker_output: str | None = None
+    previous_llm_raw: str | None = None
 
     for iteration in range(1, MAX_ITERATIONS + 1):
-        files = _list_source_files(repo_root, source_dir)
-        codebase = _render_codebase(source_dir, files, checker_rel, config.not_sent)
-        specs_diff = _specs_diff_against_main(repo_root, source_dir)
-
-        prompt_parts = [
-            'You are a coding agent reconciling code and specs.',
-            'Do not assume any code is currently correct.',
-            'Changes to specs are a last resort unless specs contradict each other.',
-            'If specs are contradictory or incomplete, use the provided tools.',
-            'Respond with ONLY a JSON object with keys high-level-description, implementation-decisions, create-or-update, and delete.',
-            codebase,
-        ]
+        files = _list_source_files(repo_root, source_dir, source_rel_to_repo)
+        specs_diff = _specs_diff_against_main(repo_root, source_rel_to_repo)
+
+        prompt_buffer = io.StringIO()
+        prompt_buffer.write(PROMPT_PREAMBLE)
+        _render_codebase(prompt_buffer, source_dir, files, checker_rel, config.not_sent)
 
         if specs_diff:
-            prompt_parts.append(
-                f'''--- SPECS DIFF VS main ---
+            prompt_buffer.write(
+                f'''{DOUBLE_NL}--- SPECS DIFF VS main ---
 {specs_diff}
 --- END SPECS DIFF VS main ---'''
             )
 
         if previous_checker_output is not None:
-            prompt_parts.append(
-                f'''--- CORRECTNESS CHECKER OUTPUT ---
+            prompt_buffer.write(
+                f'''{DOUBLE_NL}--- CORRECTNESS CHECKER OUTPUT ---
 {previous_checker_output}
 --- END CORRECTNESS CHECKER OUTPUT ---'''
             )
 
-        prompt = DOUBLE_NL.join(prompt_parts)
-        llm_raw = _invoke_llm(prompt)
+        prompt = prompt_buffer.getvalue()
+        llm_raw = _invoke_llm(prompt, llm)
+        if llm_raw == previous_llm_raw:
+            # That exact plan has already been applied and checked, so another round would
+            # only burn a checker run and an LLM call to get the same findings back.
+            print('Model repeated its previous response; human intervention required.', file=sys.stderr)
+            return 1
+        previous_llm_raw = llm_raw
+
         high_level_description, implementation_decisions, create, deletes = _parse_plan(llm_raw)
         _print_llm_commentary(high_level_description, implementation_decisions)
         _apply_plan(source_dir, create, deletes, config, checker_rel)